@@ -0,0 +1,104 @@
+# Backend/bench_embeddings.py
+"""
+Benchmark embedding backends on the bundled Assets docs.
+
+Reports chunks/sec for each backend, top-k retrieval overlap against the fp32
+baseline and the mean per-chunk cosine similarity between fp32 and int8
+vectors. Both backends run on CPU so the comparison is like-for-like.
+top_k is capped at half the number of chunks so the overlap figure stays
+meaningful on small doc sets. Run from the repo root:
+
+    python -m Backend.bench_embeddings --threads 4 --top-k 2
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from Backend.parsers import extract_text
+from Backend.chunker import split_text
+from Backend.embeddings import BACKENDS, load_model, embed_texts
+from Backend.config import EMBED_BATCH_SIZE
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "Assets"
+
+QUERIES = [
+    "discount code SAVE15",
+    "invalid discount code error message",
+    "express shipping cost",
+    "maximum quantity per item",
+    "pay now button behavior",
+    "form validation error color",
+    "payment method options",
+    "apply coupon API endpoint",
+]
+
+
+def load_asset_chunks(assets_dir: Path = ASSETS_DIR) -> List[str]:
+    chunks: List[str] = []
+    for p in sorted(assets_dir.rglob("*")):
+        if not p.is_file():
+            continue
+        text = extract_text(str(p))
+        if text and text.strip():
+            chunks.extend(split_text(text))
+    return chunks
+
+
+def _top_k(doc_vecs: np.ndarray, query_vecs: np.ndarray, k: int) -> List[set]:
+    d = doc_vecs / np.linalg.norm(doc_vecs, axis=1, keepdims=True)
+    q = query_vecs / np.linalg.norm(query_vecs, axis=1, keepdims=True)
+    sims = q @ d.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in sims]
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two equally shaped matrices."""
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=None, help="torch intra-op threads (default: torch default)")
+    ap.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    ap.add_argument("--repeats", type=int, default=3, help="timed encode passes per backend")
+    ap.add_argument("--top-k", type=int, default=2)
+    args = ap.parse_args()
+
+    chunks = load_asset_chunks()
+    if not chunks:
+        raise SystemExit(f"No chunks found under {ASSETS_DIR}")
+    k = max(1, min(args.top_k, len(chunks) // 2))
+    print(f"{len(chunks)} chunks from {ASSETS_DIR}, {len(QUERIES)} queries, top_k={k}")
+
+    results = {}
+    for backend in BACKENDS:
+        m = load_model(backend, num_threads=args.threads, device="cpu")
+        embed_texts(chunks[:2], model_=m, batch_size=args.batch_size)  # warm-up
+
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            doc_vecs = embed_texts(chunks, model_=m, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        query_vecs = embed_texts(QUERIES, model_=m, batch_size=args.batch_size)
+        results[backend] = {
+            "chunks_per_sec": len(chunks) * args.repeats / elapsed,
+            "doc_vecs": np.asarray(doc_vecs),
+            "top_k": _top_k(np.asarray(doc_vecs), np.asarray(query_vecs), k),
+        }
+
+    baseline = results["fp32"]
+    print(f"{'backend':<8} {'chunks/sec':>12} {'speedup':>8} {'overlap@' + str(k):>11} {'cos_vs_fp32':>12}")
+    for backend, r in results.items():
+        overlap = np.mean([len(a & b) / k for a, b in zip(r["top_k"], baseline["top_k"])])
+        speedup = r["chunks_per_sec"] / baseline["chunks_per_sec"]
+        cos = np.mean(_cosine_rows(r["doc_vecs"], baseline["doc_vecs"]))
+        print(f"{backend:<8} {r['chunks_per_sec']:>12.1f} {speedup:>7.2f}x {overlap:>11.3f} {cos:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
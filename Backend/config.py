@@ -4,9 +4,27 @@ from pathlib import Path
 # Root directory where all project folders live (absolute to avoid cwd issues)
 PROJECT_ROOT = (Path.cwd() / "ProjectData").resolve()
 
+# Resumable uploads (frontend -> backend)
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+UPLOAD_MAX_CHUNK_SIZE = 32 * 1024 * 1024
+# Upload sessions idle for longer than this (seconds) are removed
+UPLOAD_SESSION_TTL = 24 * 60 * 60
+
 # Chunking config
 CHUNK_SIZE = 800
 CHUNK_OVERLAP = 200
 
 # Embedding model
 EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+# Embedding backend: "fp32" (stock SentenceTransformer) or "int8" (dynamically quantized, CPU)
+EMBED_BACKEND = "fp32"
+# torch intra-op threads for encoding (None -> torch default)
+EMBED_NUM_THREADS = None
+# Batch size for encode(); batches are built from length-sorted texts
+EMBED_BATCH_SIZE = 32
+
+# Context packing (retrieval -> LLM prompt)
+# Token budget for the packed context sent to Gemini per request.
+CONTEXT_TOKEN_BUDGET = 3000
+# Rough chars-per-token ratio used to estimate prompt size without a tokenizer.
+CHARS_PER_TOKEN = 4
@@ -0,0 +1,208 @@
+# Backend/context.py
+"""
+Context assembly between retrieval and generation.
+
+Retrieved chunks from the same source_document with consecutive chunk_ids
+share up to CHUNK_OVERLAP characters of text. This module groups hits by
+document, merges consecutive chunks (dropping the duplicated overlap) and
+packs the merged blocks into a token budget, most relevant block first.
+"""
+
+from typing import List, Dict, Any
+
+from Backend.config import CHUNK_OVERLAP, CONTEXT_TOKEN_BUDGET, CHARS_PER_TOKEN
+
+# Shorter suffix/prefix matches are treated as coincidence, not splitter overlap.
+MIN_OVERLAP = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    if not text:
+        return 0
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+
+def _at_boundary(text: str, pos: int) -> bool:
+    """
+    True if a match starting at text[pos:] begins on a boundary: at the start of
+    text, after whitespace/punctuation, or itself starting with a separator
+    (the splitter keeps separators such as "." at the start of the next chunk).
+    """
+    return pos == 0 or not text[pos - 1].isalnum() or not text[pos].isalnum()
+
+
+def _overlap_len(prev: str, nxt: str, max_overlap: int = CHUNK_OVERLAP) -> int:
+    """
+    Length of the overlap between the end of prev and the start of nxt.
+
+    Only matches of at least MIN_OVERLAP chars that start on a boundary count;
+    anything else is reported as 0 (no overlap).
+    """
+    limit = min(len(prev), len(nxt), max_overlap)
+    for k in range(limit, MIN_OVERLAP - 1, -1):
+        if prev.endswith(nxt[:k]) and _at_boundary(prev, len(prev) - k):
+            return k
+    return 0
+
+
+def _join(prev: str, nxt: str):
+    """
+    Append nxt to prev, removing real overlap or separating with a newline.
+    Returns (joined_text, overlap_chars_removed).
+    """
+    k = _overlap_len(prev, nxt)
+    if k:
+        return prev + nxt[k:], k
+    return prev + "\n" + nxt, 0
+
+
+def _distance(item: Dict[str, Any]) -> float:
+    d = item.get("distance")
+    return float(d) if isinstance(d, (int, float)) else float("inf")
+
+
+def _merge_parts(parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge parts of one document (each: chunk_id, text, distance) into blocks,
+    joining runs of consecutive chunk_ids. Each block keeps its parts so it can
+    be split again if it does not fit the budget.
+    """
+    blocks: List[Dict[str, Any]] = []
+    current = None
+    for part in sorted(parts, key=lambda p: p["chunk_id"]):
+        if current is not None and part["chunk_id"] == current["parts"][-1]["chunk_id"] + 1:
+            current["text"], removed = _join(current["text"], part["text"])
+            current["overlap_chars"] += removed
+            current["parts"].append(part)
+            current["distance"] = min(current["distance"], part["distance"])
+            continue
+        if current is not None:
+            blocks.append(current)
+        current = {"text": part["text"], "parts": [part], "distance": part["distance"], "overlap_chars": 0}
+    if current is not None:
+        blocks.append(current)
+
+    for b in blocks:
+        b["tokens"] = estimate_tokens(b["text"])
+    return blocks
+
+
+def merge_chunks(retrieved: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Group retrieved items by source_document and merge runs of consecutive chunk_ids.
+
+    Each returned block has: text, source_document, parts (the chunks it was
+    built from), distance (best of its chunks) and tokens. Items without a
+    usable chunk_id become single-part blocks.
+    """
+    groups: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    blocks: List[Dict[str, Any]] = []
+
+    for item in retrieved or []:
+        md = item.get("metadata") or {}
+        src = md.get("source_document", "unknown")
+        cid = md.get("chunk_id")
+        part = {"chunk_id": cid, "text": item.get("text", "") or "", "distance": _distance(item)}
+        if not isinstance(cid, int):
+            blocks.append({"text": part["text"], "source_document": src, "parts": [part],
+                           "distance": part["distance"], "overlap_chars": 0,
+                           "tokens": estimate_tokens(part["text"])})
+            continue
+        # de-duplicate by chunk_id, keep the closest hit
+        by_id = groups.setdefault(src, {})
+        if cid not in by_id or part["distance"] < by_id[cid]["distance"]:
+            by_id[cid] = part
+
+    for src, by_id in groups.items():
+        for b in _merge_parts(list(by_id.values())):
+            b["source_document"] = src
+            blocks.append(b)
+    return blocks
+
+
+def pack_context(retrieved: List[Dict[str, Any]], token_budget: int = CONTEXT_TOKEN_BUDGET) -> Dict[str, Any]:
+    """
+    Merge retrieved chunks and pack them into token_budget, ordered by relevance.
+
+    A merged block that does not fit the remaining budget falls back to its
+    individual chunks (most relevant first), which are re-merged where still
+    consecutive. Returns a dict with:
+    - blocks: packed blocks (most relevant first)
+    - stats: raw/packed token counts, tokens saved by overlap removal in the
+      packed context, and tokens/chunks left out because of the budget
+    """
+    blocks = sorted(merge_chunks(retrieved), key=lambda b: b["distance"])
+
+    packed: List[Dict[str, Any]] = []
+    used = 0
+    for b in blocks:
+        if used + b["tokens"] <= token_budget:
+            packed.append(b)
+            used += b["tokens"]
+            continue
+        if len(b["parts"]) < 2 or b["parts"][0]["chunk_id"] is None:
+            continue
+        # fall back to the block's own chunks: add them most relevant first,
+        # keeping one only if the re-merged result still fits the budget
+        chosen: List[Dict[str, Any]] = []
+        subs: List[Dict[str, Any]] = []
+        for part in sorted(b["parts"], key=lambda p: p["distance"]):
+            trial = _merge_parts(chosen + [part])
+            if used + sum(sb["tokens"] for sb in trial) <= token_budget:
+                chosen.append(part)
+                subs = trial
+        for sub in subs:
+            sub["source_document"] = b["source_document"]
+            packed.append(sub)
+            used += sub["tokens"]
+
+    packed.sort(key=lambda b: b["distance"])
+
+    all_parts = [p for b in blocks for p in b["parts"]]
+    packed_parts = [p for b in packed for p in b["parts"]]
+    raw_tokens = sum(estimate_tokens(p["text"]) for p in all_parts)
+    packed_raw_tokens = sum(estimate_tokens(p["text"]) for p in packed_parts)
+    # characters actually stripped as duplicated overlap in the packed context
+    overlap_chars = sum(b["overlap_chars"] for b in packed)
+
+    out = []
+    for b in packed:
+        ids = [p["chunk_id"] for p in b["parts"] if p["chunk_id"] is not None]
+        out.append({
+            "text": b["text"],
+            "source_document": b["source_document"],
+            "chunk_ids": ids,
+            "distance": None if b["distance"] == float("inf") else b["distance"],
+            "tokens": b["tokens"],
+        })
+
+    return {
+        "blocks": out,
+        "stats": {
+            "token_budget": token_budget,
+            "raw_tokens": raw_tokens,
+            "packed_tokens": used,
+            # overlap removed from the content actually packed
+            "chars_saved_overlap": overlap_chars,
+            "tokens_saved_overlap": overlap_chars // CHARS_PER_TOKEN,
+            # content left out because it did not fit the budget (not a saving)
+            "tokens_dropped_budget": raw_tokens - packed_raw_tokens,
+            "chunks_dropped_budget": len(all_parts) - len(packed_parts),
+        },
+    }
+
+
+def format_context(blocks: List[Dict[str, Any]]) -> str:
+    """Render packed blocks as a prompt context string with source labels."""
+    parts = []
+    for b in blocks:
+        ids = b.get("chunk_ids") or []
+        if len(ids) > 1:
+            label = f"{b['source_document']} :: chunk_{ids[0]}-{ids[-1]}"
+        elif ids:
+            label = f"{b['source_document']} :: chunk_{ids[0]}"
+        else:
+            label = b["source_document"]
+        parts.append(f"[{label}]\n{b['text']}")
+    return "\n\n".join(parts)
@@ -1,10 +1,49 @@
 # Backend/embeddings.py
-from typing import List, Union
+from typing import List, Optional, Union
+
+import torch
 from sentence_transformers import SentenceTransformer
-from Backend.config import EMBED_MODEL_NAME
+from Backend.config import EMBED_MODEL_NAME, EMBED_BACKEND, EMBED_NUM_THREADS, EMBED_BATCH_SIZE
+
+BACKENDS = ("fp32", "int8")
+
+
+def load_model(backend: str = EMBED_BACKEND,
+               num_threads: Optional[int] = EMBED_NUM_THREADS,
+               device: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load the embedding model for the given backend.
+
+    - "fp32": stock SentenceTransformer on device (None -> SentenceTransformer's default, may be CUDA).
+    - "int8": CPU model with nn.Linear layers dynamically quantized to int8 (CPU only).
+    num_threads sets torch's intra-op thread count (process-wide) when given.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {BACKENDS}")
 
-# Load model (this will download from HF the first time)
-model = SentenceTransformer(EMBED_MODEL_NAME)
+    if num_threads:
+        torch.set_num_threads(int(num_threads))
+
+    if backend == "int8":
+        if device not in (None, "cpu"):
+            raise ValueError("The int8 backend only runs on CPU")
+        m = SentenceTransformer(EMBED_MODEL_NAME, device="cpu")
+        m.eval()
+        return torch.ao.quantization.quantize_dynamic(m, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    return SentenceTransformer(EMBED_MODEL_NAME, device=device)
+
+
+# Module-level model, loaded on first use (this will download from HF the first time)
+model: Optional[SentenceTransformer] = None
+
+
+def get_model() -> SentenceTransformer:
+    """Return the configured module-level model, loading it on first call."""
+    global model
+    if model is None:
+        model = load_model()
+    return model
 
 
 def _to_list(v):
@@ -19,12 +58,15 @@ def _to_list(v):
             return [v]
 
 
-def embed_texts(texts: Union[str, List[str]]) -> List[List[float]]:
+def embed_texts(texts: Union[str, List[str]],
+                model_: Optional[SentenceTransformer] = None,
+                batch_size: int = EMBED_BATCH_SIZE) -> List[List[float]]:
     """
     Return list of vectors for texts.
 
     - Accepts a single string or a list of strings.
     - Always returns a list of Python lists (not numpy arrays).
+    - model_ overrides the module-level model (e.g. for benchmarking backends).
     """
     if texts is None:
         return []
@@ -36,8 +78,12 @@ def embed_texts(texts: Union[str, List[str]]) -> List[List[float]]:
     if not isinstance(texts, (list, tuple)) or len(texts) == 0:
         return []
 
-    # Encode (SentenceTransformer returns a numpy array)
-    vectors = model.encode(texts, show_progress_bar=False)
+    m = model_ if model_ is not None else get_model()
+
+    # encode() sorts inputs by length before batching (minimizes padding)
+    # and restores the original order in its output.
+    with torch.inference_mode():
+        vectors = m.encode(list(texts), batch_size=batch_size, show_progress_bar=False)
 
     # Convert to Python list of lists
     return _to_list(vectors)
@@ -1,14 +1,17 @@
 # Backend/main.py
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pathlib import Path
 
 # Phase 1 imports
 from Backend.embed import create_project_and_ingest
+from Backend import uploads
+from Backend.config import UPLOAD_CHUNK_SIZE
 
 # Phase 2 imports
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 from Backend.rag.testcase_generator import generate_testcases
 
 # Phase 3 imports
@@ -17,6 +20,8 @@ from Backend.rag.scriptgen import generate_script_for_testcase
 
 # Debug / retrieval import
 from Backend.rag.rag import retrieve as rag_retrieve
+from Backend.context import pack_context
+from Backend.config import CONTEXT_TOKEN_BUDGET
 
 app = FastAPI(title="AutoTesting Agent Backend (Phase 1 + Phase 2 + Phase 3)")
 
@@ -63,6 +68,96 @@ async def upload_and_build(
     return JSONResponse(result)
 
 
+# ====================================================
+# PHASE 1 — RESUMABLE CHUNKED UPLOADS
+# ====================================================
+class UploadStart(BaseModel):
+    client_id: str
+    filename: str
+    size: int
+    sha256: str
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+
+
+class BuildFromUploads(BaseModel):
+    upload_ids: List[str] = Field(..., min_length=1)
+    include_checkout_html: bool = True
+
+
+@app.post("/uploads/start")
+def upload_start(body: UploadStart):
+    """
+    Start (or resume) an upload session for one file of one client.
+    Returns upload_id, chunk_size, total_parts and the parts already received.
+    """
+    try:
+        return JSONResponse(uploads.start(body.client_id, body.filename, body.size, body.sha256, body.chunk_size))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/uploads/{upload_id}")
+def upload_status(upload_id: str):
+    try:
+        return JSONResponse(uploads.status(upload_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown upload: {upload_id}")
+
+
+@app.put("/uploads/{upload_id}/parts/{index}")
+async def upload_part(upload_id: str, index: int, request: Request):
+    """Upload one part as the raw request body. Re-sending a part overwrites it."""
+    try:
+        return JSONResponse(await uploads.write_part(upload_id, index, request.stream()))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown upload: {upload_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/uploads/{upload_id}/complete")
+def upload_complete(upload_id: str):
+    """
+    Assemble parts on disk and verify the sha256 given at start.
+    Plain def: the blocking read/hash/write runs in the threadpool.
+    """
+    try:
+        return JSONResponse(uploads.complete(upload_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown upload: {upload_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.post("/build_from_uploads")
+def build_from_uploads(body: BuildFromUploads):
+    """
+    Build a project KB from completed upload sessions (same result as /upload_and_build).
+    Upload sessions are removed once the project has been ingested.
+    """
+    try:
+        paths = [uploads.assembled_path(uid) for uid in body.upload_ids]
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown upload: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    checkout_path = None
+    if body.include_checkout_html:
+        for p in paths:
+            if p.name.lower() == "checkout.html":
+                checkout_path = p
+                break
+
+    result = create_project_and_ingest(uploaded_files=paths, checkout_path=checkout_path)
+
+    if "error" not in result:
+        for uid in body.upload_ids:
+            uploads.discard(uid)
+
+    return JSONResponse(result)
+
+
 # ====================================================
 # PHASE 2 — RAG TEST CASE GENERATION
 # ====================================================
@@ -112,14 +207,24 @@ async def generate_script(body: GenerateScriptRequest):
 # DEBUG: retrieval-only endpoint (no LLM calls)
 # ====================================================
 @app.post("/debug/retrieve")
-async def debug_retrieve(project_id: str = Form(...), query: str = Form(...), top_k: int = Form(6)):
+async def debug_retrieve(project_id: str = Form(...), query: str = Form(...), top_k: int = Form(6),
+                         token_budget: int = Form(CONTEXT_TOKEN_BUDGET)):
     """
     Debug endpoint: run retrieval only and return raw retrieved chunks.
     Use this to confirm the backend's retrieval output separately from LLM.
+    Also returns the packed context (merged overlaps, token budget) and tokens saved.
     """
     try:
         items = rag_retrieve(project_id, query, top_k=top_k)
-        return JSONResponse({"project_id": project_id, "query": query, "retrieved_count": len(items), "retrieved": items})
+        packed = pack_context(items, token_budget=token_budget)
+        return JSONResponse({
+            "project_id": project_id,
+            "query": query,
+            "retrieved_count": len(items),
+            "retrieved": items,
+            "context": packed["blocks"],
+            "context_stats": packed["stats"],
+        })
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -0,0 +1,230 @@
+# Backend/uploads.py
+"""
+Chunked, resumable upload sessions.
+
+A session lives in ProjectData/_uploads/<upload_id>/ and holds:
+- meta.json: client_id, filename, size, sha256, chunk_size, total_parts
+- parts/<index>.part: received parts
+- assembled/<filename>: the assembled file once complete() verified its hash
+
+The upload_id is derived from (client_id, filename, size, sha256), so the same
+client starting the same upload again resumes the existing session and only
+sends the parts that are still missing, while different clients never share
+a session. Sessions idle for longer than UPLOAD_SESSION_TTL are removed the
+next time any upload starts.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+from Backend.config import PROJECT_ROOT, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_CHUNK_SIZE, UPLOAD_SESSION_TTL
+
+UPLOADS_ROOT = PROJECT_ROOT / "_uploads"
+
+
+def _session_dir(upload_id: str) -> Path:
+    # upload ids are hex digests; reject anything that could escape UPLOADS_ROOT
+    if not upload_id.startswith("up_") or not upload_id[3:].isalnum():
+        raise KeyError(upload_id)
+    return UPLOADS_ROOT / upload_id
+
+
+def _load_meta(upload_id: str) -> Dict[str, Any]:
+    meta_path = _session_dir(upload_id) / "meta.json"
+    if not meta_path.exists():
+        raise KeyError(upload_id)
+    return json.loads(meta_path.read_text(encoding="utf-8"))
+
+
+def _assembled(upload_id: str, meta: Dict[str, Any]) -> Path:
+    return _session_dir(upload_id) / "assembled" / meta["filename"]
+
+
+def _touch(upload_id: str) -> None:
+    """Record activity on a session (meta.json mtime drives TTL expiry)."""
+    try:
+        os.utime(_session_dir(upload_id) / "meta.json")
+    except OSError:
+        pass
+
+
+def sweep_expired(ttl: float = UPLOAD_SESSION_TTL) -> int:
+    """Remove sessions with no activity for ttl seconds. Returns how many were removed."""
+    if not UPLOADS_ROOT.exists():
+        return 0
+    cutoff = time.time() - ttl
+    removed = 0
+    for d in UPLOADS_ROOT.iterdir():
+        if not d.is_dir():
+            continue
+        meta_path = d / "meta.json"
+        try:
+            mtime = (meta_path if meta_path.exists() else d).stat().st_mtime
+        except OSError:
+            continue
+        if mtime < cutoff:
+            shutil.rmtree(d, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _received_parts(upload_id: str) -> List[int]:
+    parts_dir = _session_dir(upload_id) / "parts"
+    if not parts_dir.exists():
+        return []
+    return sorted(int(p.stem) for p in parts_dir.glob("*.part"))
+
+
+def _expected_part_size(meta: Dict[str, Any], index: int) -> int:
+    if index < meta["total_parts"] - 1:
+        return meta["chunk_size"]
+    return meta["size"] - meta["chunk_size"] * (meta["total_parts"] - 1)
+
+
+def status(upload_id: str) -> Dict[str, Any]:
+    """Return session metadata plus received parts and completion state."""
+    meta = _load_meta(upload_id)
+    complete = _assembled(upload_id, meta).is_file()
+    return {**meta, "upload_id": upload_id, "received": _received_parts(upload_id), "complete": complete}
+
+
+def start(client_id: str, filename: str, size: int, sha256: str,
+          chunk_size: int = UPLOAD_CHUNK_SIZE) -> Dict[str, Any]:
+    """Create (or resume) an upload session for client_id and return its status."""
+    if not client_id or len(client_id) > 64:
+        raise ValueError("client_id must be 1..64 characters")
+    filename = Path(filename).name
+    if not filename or filename in (".", ".."):
+        raise ValueError(f"Invalid filename: {filename!r}")
+    if size < 0:
+        raise ValueError("size must be >= 0")
+    if not 0 < chunk_size <= UPLOAD_MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be in 1..{UPLOAD_MAX_CHUNK_SIZE}")
+    sha256 = sha256.lower()
+
+    sweep_expired()
+
+    key = f"{client_id}:{filename}:{size}:{sha256}"
+    upload_id = "up_" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+    base = _session_dir(upload_id)
+
+    if (base / "meta.json").exists():
+        _touch(upload_id)
+        return status(upload_id)
+
+    (base / "parts").mkdir(parents=True, exist_ok=True)
+    meta = {
+        "client_id": client_id,
+        "filename": filename,
+        "size": size,
+        "sha256": sha256,
+        "chunk_size": chunk_size,
+        "total_parts": -(-size // chunk_size),
+    }
+    (base / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return status(upload_id)
+
+
+async def write_part(upload_id: str, index: int, stream: AsyncIterator[bytes]) -> Dict[str, Any]:
+    """
+    Stream one part to disk. The part is written to a temp file and renamed,
+    so an interrupted request never leaves a truncated part behind.
+    File I/O runs in worker threads so the event loop is not blocked.
+    """
+    meta = await asyncio.to_thread(_load_meta, upload_id)
+    if not 0 <= index < meta["total_parts"]:
+        raise ValueError(f"Part index {index} out of range 0..{meta['total_parts'] - 1}")
+
+    expected = _expected_part_size(meta, index)
+    parts_dir = _session_dir(upload_id) / "parts"
+    await asyncio.to_thread(parts_dir.mkdir, parents=True, exist_ok=True)
+    # unique per request: a retried PUT racing the original never shares a file
+    tmp = parts_dir / f"{index}.{uuid.uuid4().hex}.tmp"
+
+    written = 0
+    fh = await asyncio.to_thread(open, tmp, "wb")
+    try:
+        async for data in stream:
+            written += len(data)
+            if written > expected:
+                break
+            await asyncio.to_thread(fh.write, data)
+    except BaseException:
+        # client disconnected mid-part: don't leave the temp file behind
+        await asyncio.to_thread(fh.close)
+        await asyncio.to_thread(tmp.unlink, missing_ok=True)
+        raise
+    await asyncio.to_thread(fh.close)
+
+    if written != expected:
+        await asyncio.to_thread(tmp.unlink, missing_ok=True)
+        raise ValueError(f"Part {index} has {written} bytes, expected {expected}")
+
+    await asyncio.to_thread(tmp.replace, parts_dir / f"{index}.part")
+    await asyncio.to_thread(_touch, upload_id)
+    return {"upload_id": upload_id, "index": index, "bytes": written}
+
+
+def complete(upload_id: str) -> Dict[str, Any]:
+    """
+    Assemble all parts into the final file and verify its sha256.
+    Raises ValueError if parts are missing or the hash does not match.
+    """
+    meta = _load_meta(upload_id)
+    base = _session_dir(upload_id)
+    dest = _assembled(upload_id, meta)
+    if dest.is_file():
+        return status(upload_id)
+
+    missing = sorted(set(range(meta["total_parts"])) - set(_received_parts(upload_id)))
+    if missing:
+        raise ValueError(f"Missing parts: {missing}")
+
+    h = hashlib.sha256()
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = base / "assembling.tmp"
+    with open(tmp, "wb") as out:
+        for i in range(meta["total_parts"]):
+            with open(base / "parts" / f"{i}.part", "rb") as part:
+                while True:
+                    buf = part.read(1024 * 1024)
+                    if not buf:
+                        break
+                    h.update(buf)
+                    out.write(buf)
+
+    if h.hexdigest() != meta["sha256"]:
+        tmp.unlink(missing_ok=True)
+        # drop the parts so the client re-sends them
+        shutil.rmtree(base / "parts", ignore_errors=True)
+        (base / "parts").mkdir(parents=True, exist_ok=True)
+        raise ValueError("sha256 mismatch after assembly; parts discarded")
+
+    tmp.replace(dest)
+    shutil.rmtree(base / "parts", ignore_errors=True)
+    _touch(upload_id)
+    return status(upload_id)
+
+
+def assembled_path(upload_id: str) -> Path:
+    """Path of the verified, assembled file. Raises ValueError if not complete."""
+    meta = _load_meta(upload_id)
+    dest = _assembled(upload_id, meta)
+    if not dest.is_file():
+        raise ValueError(f"Upload {upload_id} is not complete")
+    return dest
+
+
+def discard(upload_id: str) -> None:
+    """Remove an upload session and its files."""
+    try:
+        shutil.rmtree(_session_dir(upload_id), ignore_errors=True)
+    except KeyError:
+        pass
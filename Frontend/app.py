@@ -1,14 +1,83 @@
 # Frontend/app.py
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
-import tempfile
+import io
+import hashlib
+import uuid
 from pathlib import Path
 import json
 
 # Backend host
 BACKEND = os.getenv("BACKEND_URL", "http://localhost:8000")
 
+# Resumable upload part size (must not exceed the backend's UPLOAD_MAX_CHUNK_SIZE)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 4 * 1024 * 1024))
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """One pooled keep-alive session shared across reruns."""
+    session = requests.Session()
+    # Retries apply to idempotent methods only (GET/PUT), i.e. status + part uploads.
+    retry = Retry(total=5, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+http = get_http_session()
+
+# Per-browser-session id: resumes this client's own uploads, never another client's
+if "upload_client_id" not in st.session_state:
+    st.session_state["upload_client_id"] = uuid.uuid4().hex
+
+
+def file_sha256(fileobj) -> str:
+    """Hash a seekable file-like object in blocks without loading it whole."""
+    h = hashlib.sha256()
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(1024 * 1024), b""):
+        h.update(block)
+    fileobj.seek(0)
+    return h.hexdigest()
+
+
+def upload_resumable(name: str, fileobj, sha256: str) -> str:
+    """
+    Upload one file through the chunked upload-session API and return its upload_id.
+    Parts already on the backend (from an earlier, interrupted attempt) are skipped.
+    """
+    fileobj.seek(0, io.SEEK_END)
+    size = fileobj.tell()
+
+    r = http.post(f"{BACKEND}/uploads/start",
+                  json={"client_id": st.session_state["upload_client_id"], "filename": name, "size": size, "sha256": sha256, "chunk_size": UPLOAD_CHUNK_SIZE},
+                  timeout=30)
+    r.raise_for_status()
+    sess = r.json()
+    upload_id = sess["upload_id"]
+
+    if not sess.get("complete"):
+        received = set(sess.get("received", []))
+        for index in range(sess["total_parts"]):
+            if index in received:
+                continue
+            fileobj.seek(index * sess["chunk_size"])
+            part = fileobj.read(sess["chunk_size"])
+            r = http.put(f"{BACKEND}/uploads/{upload_id}/parts/{index}", data=part,
+                         headers={"Content-Type": "application/octet-stream"}, timeout=60)
+            r.raise_for_status()
+
+        r = http.post(f"{BACKEND}/uploads/{upload_id}/complete", timeout=120)
+        r.raise_for_status()
+
+    fileobj.seek(0)
+    return upload_id
+
 st.set_page_config(page_title="QA Agent — Build KB & Agent", layout="wide")
 st.title("QA Agent — Build KB (Phase 1) + Agent (Phase 2/3)")
 
@@ -32,47 +101,38 @@ if st.button("Create KB (upload & build)"):
     if (not uploaded_files or len(uploaded_files) == 0) and (not pasted_html and not html_upload):
         st.warning("Upload at least one support doc or provide checkout.html.")
     else:
-        files_payload = []
-        tmp_paths = []
+        # (name, file-like) pairs; files are read in parts, never loaded whole
+        sources = []
         
         # 1. Add uploaded support docs
         if uploaded_files:
             for f in uploaded_files:
-                files_payload.append(("files", (f.name, f.getvalue(), f.type or "application/octet-stream")))
+                sources.append((f.name, f))
         
         # 2. Handle checkout.html (Upload has priority over Paste)
         if html_upload:
-            files_payload.append(("files", (html_upload.name, html_upload.getvalue(), html_upload.type or "text/html")))
+            sources.append((html_upload.name, html_upload))
         elif pasted_html:
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".html")
-            tmp.write(pasted_html.encode("utf-8"))
-            tmp.flush(); tmp.close()
-            tmp_paths.append(tmp.name)
-            with open(tmp.name, "rb") as b:
-                files_payload.append(("files", ("checkout.html", b.read(), "text/html")))
+            sources.append(("checkout.html", io.BytesIO(pasted_html.encode("utf-8"))))
+
+        hashed = [(name, fobj, file_sha256(fobj)) for name, fobj in sources]
 
+        result = None
         with st.spinner("Uploading files and building knowledge base (this may take a moment)..."):
             try:
-                # Auto-set include_checkout_html to true. 
-                # The backend will only find it if we actually added it to files_payload above.
-                resp = requests.post(
-                    f"{BACKEND}/upload_and_build",
-                    files=files_payload,
-                    data={"include_checkout_html": "true"}, 
+                upload_ids = [upload_resumable(name, fobj, sha) for name, fobj, sha in hashed]
+                # Auto-set include_checkout_html to true.
+                # The backend will only find it if we actually uploaded it above.
+                resp = http.post(
+                    f"{BACKEND}/build_from_uploads",
+                    json={"upload_ids": upload_ids, "include_checkout_html": True},
                     timeout=600
                 )
             except Exception as e:
-                st.error("Failed to reach backend:")
+                st.error("Failed to reach backend (click again to resume the upload):")
                 st.exception(e)
                 resp = None
 
-        # cleanup temp files
-        for p in tmp_paths:
-            try:
-                os.unlink(p)
-            except:
-                pass
-
         if resp is None:
             pass
         elif resp.status_code != 200:
@@ -83,11 +143,22 @@ if st.button("Create KB (upload & build)"):
                 pass
         else:
             result = resp.json()
-            proj = result.get("project_id")
-            st.success("✅ Knowledge base created successfully.")
-            st.info(f"Project ID: `{proj}` — keep this for Agent Mode (auto-saved).")
+
+        if result is not None and "error" in result:
+            st.error("Knowledge base build failed:")
             st.json(result)
+        elif result is not None:
+            proj = result.get("project_id")
             st.session_state["last_project"] = proj
+            st.session_state["last_kb_result"] = result
+            st.success("✅ Knowledge base created successfully.")
+
+# Persist the last build result across reruns
+kb_result = st.session_state.get("last_kb_result")
+if kb_result:
+    st.info(f"Project ID: `{kb_result.get('project_id')}` — keep this for Agent Mode (auto-saved).")
+    with st.expander("Build summary"):
+        st.json(kb_result)
 
 st.markdown("---")
 
@@ -125,13 +196,13 @@ with col_b:
                 payload = {"project_id": project_id, "query": query, "top_k": top_k}
                 try:
                     # Timeout set to 600s (10 mins) to handle slow local LLMs
-                    resp = requests.post(f"{BACKEND}/agent_query", json=payload, timeout=600)
+                    resp = http.post(f"{BACKEND}/agent_query", json=payload, timeout=600)
                 except Exception as e:
                     st.error("Agent request failed:")
                     st.exception(e)
                     resp = None
 
-            if resp and resp.status_code == 200:
+            if resp is not None and resp.status_code == 200:
                 try:
                     out = resp.json()
                     st.success("Agent returned results.")
@@ -202,27 +273,31 @@ if agent_out:
                         for g in t.get("Grounded_In", []):
                             st.code(g, language=None)
                     
-                    # Script Generation Button
+                    # Script Generation Button (each click regenerates; the last script is kept across reruns)
+                    script_cache = st.session_state.setdefault("script_cache", {})
+                    script_key = (project_id, json.dumps(t, sort_keys=True))
                     if st.button(f"Generate Selenium Script for {t.get('Test_ID')}", key=f"gen_{i}"):
                         with st.spinner("Generating Selenium script..."):
                             payload = {"project_id": project_id, "testcase": t}
                             try:
-                                r2 = requests.post(f"{BACKEND}/generate_script", json=payload, timeout=600)
+                                r2 = http.post(f"{BACKEND}/generate_script", json=payload, timeout=600)
                             except Exception as e:
                                 st.error("Script generation call failed:")
                                 st.exception(e)
                                 r2 = None
 
-                        if r2 and r2.status_code == 200:
+                        if r2 is not None and r2.status_code == 200:
                             sc = r2.json()
                             if sc.get("status") in ("ok", "ok_unverified"):
-                                code = sc.get("script")
-                                st.subheader("Generated Selenium Script")
-                                st.code(code, language="python")
+                                script_cache[script_key] = sc.get("script")
                             else:
                                 st.error("Script generation error:")
                                 st.write(sc)
                         else:
                             st.error("Script generation failed.")
-                            if r2: st.text(r2.text)
+                            if r2 is not None: st.text(r2.text)
+
+                    if script_key in script_cache:
+                        st.subheader("Generated Selenium Script")
+                        st.code(script_cache[script_key], language="python")
                 st.markdown("---")
\ No newline at end of file
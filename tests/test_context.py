@@ -0,0 +1,56 @@
+import pytest
+
+from Backend.config import CHARS_PER_TOKEN
+from Backend.context import pack_context, _join
+
+
+def _item(text, chunk_id, distance, src="doc.md"):
+    return {"text": text, "metadata": {"source_document": src, "chunk_id": chunk_id}, "distance": distance}
+
+
+def test_accidental_short_match_is_not_overlap():
+    assert _join("Totals are shown on the", "example page.") == ("Totals are shown on the\nexample page.", 0)
+
+
+def test_zero_overlap_joined_with_newline():
+    assert _join("ends here.", "Second paragraph.") == ("ends here.\nSecond paragraph.", 0)
+
+
+def test_split_text_sentence_overlap_is_removed():
+    split_text = pytest.importorskip("Backend.chunker").split_text
+    text = " ".join(
+        f"Sentence number {i} describes the checkout behaviour of discount codes and shipping options."
+        for i in range(60)
+    )
+    chunks = split_text(text)
+    assert len(chunks) > 2
+
+    res = pack_context([_item(c, i, 0.1 * i) for i, c in enumerate(chunks)], token_budget=10**6)
+    stats = res["stats"]
+    assert len(res["blocks"]) == 1
+    merged = res["blocks"][0]["text"]
+    # every sentence appears exactly once after merging
+    for i in range(60):
+        assert merged.count(f"Sentence number {i} ") == 1
+    assert stats["chars_saved_overlap"] > 0
+    assert stats["chars_saved_overlap"] == sum(len(c) for c in chunks) - len(merged)
+    assert stats["tokens_saved_overlap"] == stats["chars_saved_overlap"] // CHARS_PER_TOKEN
+
+
+def test_no_overlap_reports_no_savings():
+    res = pack_context([_item("First chunk text.", 0, 0.1), _item("Unrelated second chunk.", 1, 0.2)])
+    assert res["stats"]["chars_saved_overlap"] == 0
+    assert res["stats"]["tokens_saved_overlap"] == 0
+
+
+def test_fallback_respects_budget():
+    res = pack_context([_item("aaaa", 0, 0.1), _item("bbbb", 1, 0.2)], token_budget=2)
+    assert res["stats"]["packed_tokens"] <= 2
+    assert [b["chunk_ids"] for b in res["blocks"]] == [[0]]
+
+
+def test_fallback_keeps_most_relevant_chunk():
+    items = [_item("a" * 400, 0, 0.9), _item("b" * 400, 1, 0.1), _item("c" * 400, 2, 0.8)]
+    res = pack_context(items, token_budget=150)
+    assert [b["chunk_ids"] for b in res["blocks"]] == [[1]]
+    assert res["stats"]["chunks_dropped_budget"] == 2